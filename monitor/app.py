@@ -8,28 +8,35 @@ Publishes status updates via MQTT and provides a lightweight web UI.
 import os
 import sys
 import time
-import json
 import logging
 import threading
 import signal
 from datetime import datetime
-from typing import Optional, Dict, Any
-from io import BytesIO
+from typing import Optional, Dict, Any, List, Set, Tuple
 import base64
 
-import cv2
-import numpy as np
-import requests
-import paho.mqtt.client as mqtt
-import docker
-from flask import Flask, render_template, jsonify, request
-from PIL import Image
+# Taken before the third-party imports so the startup time logged by main()
+# includes loading cv2/numpy/Flask/paho; the imports below are deliberately
+# placed after it
+STARTUP_T0 = time.monotonic()
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+import orjson  # noqa: E402
+import requests  # noqa: E402
+from requests.adapters import HTTPAdapter  # noqa: E402
+import paho.mqtt.client as mqtt  # noqa: E402
+from flask import Flask, Response, render_template, request  # noqa: E402
+from waitress import serve  # noqa: E402
 
 # Configuration from environment variables
 class Config:
     # RTSP
     RTSP_STREAM_URL = os.getenv('RTSP_STREAM_URL', 'rtsp://localhost:8554/stream')
     RTSP_TIMEOUT = int(os.getenv('RTSP_TIMEOUT', '10'))
+    RTSP_HW_DECODE = os.getenv('RTSP_HW_DECODE', 'true').lower() == 'true'
+    # Optional comma-separated CPU list to pin the RTSP reader thread to (Linux only)
+    RTSP_READER_CPUS = {int(cpu) for cpu in os.getenv('RTSP_READER_CPUS', '').split(',') if cpu.strip()}
 
     # MQTT
     MQTT_BROKER_HOST = os.getenv('MQTT_BROKER_HOST', 'localhost')
@@ -47,11 +54,14 @@ class Config:
     ML_API_URL = os.getenv('ML_API_URL', 'http://ml_api:3333')
     DETECTION_THRESHOLD = float(os.getenv('DETECTION_THRESHOLD', '0.6'))
     ML_API_TIMEOUT = int(os.getenv('ML_API_TIMEOUT', '15'))
+    ML_INPUT_SIZE = int(os.getenv('ML_INPUT_SIZE', '640'))  # long edge in pixels
 
     # Motion Detection
     MOTION_INTENSITY_THRESHOLD = int(os.getenv('MOTION_INTENSITY_THRESHOLD', '30'))
     MOTION_PIXEL_THRESHOLD = int(os.getenv('MOTION_PIXEL_THRESHOLD', '500'))
     IDLE_TIMEOUT = int(os.getenv('IDLE_TIMEOUT', '60'))
+    # Consecutive motionless checks (while active) that may reuse the last ML result; 0 = never skip
+    ML_MAX_SKIPPED_CHECKS = int(os.getenv('ML_MAX_SKIPPED_CHECKS', '3'))
 
     # Web UI - Internal port is always 8080, external port mapping is in docker-compose
     INTERNAL_PORT = 8080
@@ -78,11 +88,15 @@ logger = logging.getLogger(__name__)
 
 # Global state
 class State:
+    # Datetime fields whose ISO strings are cached on write, so status polls
+    # don't format them under the lock
+    ISO_FIELDS = ('last_check_time', 'last_motion_time')
+
     def __init__(self):
         self.lock = threading.Lock()
         self.last_check_time: Optional[datetime] = None
-        self.last_frame: Optional[np.ndarray] = None
-        self.last_frame_base64: Optional[str] = None
+        self.last_frame_jpeg: Optional[bytes] = None  # clean frame fetched by the ML API
+        self.last_preview_jpeg: Optional[bytes] = None  # timestamped frame for the web UI
         self.current_status: str = 'starting'  # starting, ok, failure, error, standby
         self.failure_detected: bool = False
         self.detection_confidence: float = 0.0
@@ -92,38 +106,71 @@ class State:
         self.stream_connected: bool = False
         self.total_checks: int = 0
         self.failed_checks: int = 0
-        # Motion detection
+        # Motion detection - wall-clock time for display, monotonic time for idle checks
         self.last_motion_time: Optional[datetime] = None
+        self.last_motion_monotonic: Optional[float] = None
         # Standby mode
         self.standby_mode: bool = False
-        self.last_activity_time: Optional[datetime] = datetime.now()
+        self.last_activity_monotonic: float = time.monotonic()
         self.ml_container_running: bool = True
+        # Cached ISO strings for ISO_FIELDS
+        self.last_check_time_iso: Optional[str] = None
+        self.last_motion_time_iso: Optional[str] = None
+        # Bumped on every write; keys the serialized status cache
+        self.version: int = 0
+        self._status_json: Optional[Tuple[int, bytes]] = None
 
     def update(self, **kwargs):
         with self.lock:
             for key, value in kwargs.items():
                 if hasattr(self, key):
                     setattr(self, key, value)
+                    if key in self.ISO_FIELDS:
+                        setattr(self, f'{key}_iso', value.isoformat() if value else None)
+            self.version += 1
 
-    def get_state_dict(self) -> Dict[str, Any]:
+    def increment(self, field: str, by: int = 1):
+        """Atomically add to a counter field"""
         with self.lock:
-            return {
-                'last_check_time': self.last_check_time.isoformat() if self.last_check_time else None,
-                'current_status': self.current_status,
-                'failure_detected': self.failure_detected,
-                'detection_confidence': self.detection_confidence,
-                'error_message': self.error_message,
-                'mqtt_connected': self.mqtt_connected,
-                'ml_api_healthy': self.ml_api_healthy,
-                'stream_connected': self.stream_connected,
-                'total_checks': self.total_checks,
-                'failed_checks': self.failed_checks,
-                'last_frame': self.last_frame_base64,
-                'last_motion_time': self.last_motion_time.isoformat() if self.last_motion_time else None,
-                'standby_mode': self.standby_mode,
-                'standby_enabled': Config.STANDBY_MODE_ENABLED,
-                'ml_container_running': self.ml_container_running
-            }
+            setattr(self, field, getattr(self, field) + by)
+            self.version += 1
+
+    def get_status_json(self) -> Tuple[bytes, int]:
+        """Return the serialized state dict and its version, re-serializing
+        only when state has changed since the last call"""
+        with self.lock:
+            cached = self._status_json
+            if cached is not None and cached[0] == self.version:
+                return cached[1], cached[0]
+            # Take a consistent snapshot under the lock, build the dict outside it
+            snapshot = self.__dict__.copy()
+        body = orjson.dumps(self._build_state_dict(snapshot))
+        self._status_json = (snapshot['version'], body)
+        return body, snapshot['version']
+
+    @staticmethod
+    def _build_state_dict(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        # The base64 preview is only needed by the web UI, so it is encoded here
+        # (once per state version, when polled) rather than on every monitor tick
+        preview_jpeg = snapshot['last_preview_jpeg']
+        frame_b64 = base64.b64encode(preview_jpeg).decode('ascii') if preview_jpeg else None
+        return {
+            'last_check_time': snapshot['last_check_time_iso'],
+            'current_status': snapshot['current_status'],
+            'failure_detected': snapshot['failure_detected'],
+            'detection_confidence': snapshot['detection_confidence'],
+            'error_message': snapshot['error_message'],
+            'mqtt_connected': snapshot['mqtt_connected'],
+            'ml_api_healthy': snapshot['ml_api_healthy'],
+            'stream_connected': snapshot['stream_connected'],
+            'total_checks': snapshot['total_checks'],
+            'failed_checks': snapshot['failed_checks'],
+            'last_frame': frame_b64,
+            'last_motion_time': snapshot['last_motion_time_iso'],
+            'standby_mode': snapshot['standby_mode'],
+            'standby_enabled': Config.STANDBY_MODE_ENABLED,
+            'ml_container_running': snapshot['ml_container_running']
+        }
 
 state = State()
 shutdown_event = threading.Event()
@@ -131,18 +178,34 @@ shutdown_event = threading.Event()
 # Docker Handler for ML API Container Control
 class DockerHandler:
     def __init__(self):
-        self.client: Optional[docker.DockerClient] = None
-        self.container: Optional[docker.models.containers.Container] = None
+        self.client: Optional['docker.DockerClient'] = None
+        self.container: Optional['docker.models.containers.Container'] = None
         self.enabled = Config.STANDBY_MODE_ENABLED
+        # Set while the container is running; maintained from the Docker events stream
+        self.running_event = threading.Event()
+        # True only while running_event is known to match Docker (stream subscribed and resynced)
+        self.events_synced = False
+        self.events_thread: Optional[threading.Thread] = None
 
         if not self.enabled:
             logger.info("Standby mode is DISABLED - ML container will always run")
             return
 
+        # Imported here so deployments without standby mode don't pay for the Docker SDK
+        try:
+            import docker
+        except ImportError as e:
+            logger.error(f"✗ Docker SDK not available: {e}")
+            logger.error("  → Standby mode will not be available")
+            self.enabled = False
+            return
+
         try:
             self.client = docker.from_env()
             self.container = self.client.containers.get(Config.ML_API_CONTAINER_NAME)
             logger.info(f"✓ Docker handler initialized for container: {Config.ML_API_CONTAINER_NAME}")
+            self.events_thread = threading.Thread(target=self._events_loop, name="DockerEventsThread", daemon=True)
+            self.events_thread.start()
         except docker.errors.DockerException as e:
             logger.error(f"✗ Failed to initialize Docker handler: {e}")
             logger.error("  → Standby mode will not be available")
@@ -151,11 +214,47 @@ class DockerHandler:
             logger.error(f"✗ Unexpected error initializing Docker handler: {e}")
             self.enabled = False
 
+    def _events_loop(self):
+        """Follow start/stop events for the ML container instead of polling its status"""
+        while not shutdown_event.is_set():
+            try:
+                events = self.client.events(
+                    decode=True,
+                    filters={'type': 'container', 'container': self.container.id}
+                )
+                # Resync in case the container changed state while we weren't listening
+                self.container.reload()
+                self._set_running(self.container.status == 'running')
+                self.events_synced = True
+
+                for event in events:
+                    action = event.get('Action') or event.get('status')
+                    if action == 'start':
+                        self._set_running(True)
+                    elif action in ('die', 'stop'):
+                        self._set_running(False)
+            except Exception as e:
+                logger.warning(f"Docker events stream error: {e} - reconnecting")
+            # Stream ended or failed - running_event may go stale until the next resync
+            self.events_synced = False
+            shutdown_event.wait(5)
+
+    def _set_running(self, running: bool):
+        if running:
+            self.running_event.set()
+        else:
+            self.running_event.clear()
+        state.update(ml_container_running=running)
+
     def is_container_running(self) -> bool:
         """Check if ML API container is running"""
         if not self.enabled or not self.container:
             return True
 
+        # The events stream keeps running_event current; only query Docker without it
+        if self.events_synced:
+            return self.running_event.is_set()
+
         try:
             self.container.reload()
             return self.container.status == 'running'
@@ -172,6 +271,7 @@ class DockerHandler:
         try:
             logger.info(f"Stopping ML API container: {Config.ML_API_CONTAINER_NAME}")
             self.container.stop(timeout=10)
+            self.running_event.clear()
             state.update(ml_container_running=False, ml_api_healthy=False)
             logger.info("✓ ML API container stopped - VRAM freed")
             return True
@@ -186,22 +286,36 @@ class DockerHandler:
             return False
 
         try:
+            # Already up (e.g. started outside the monitor) - no start or warm-up needed
+            if self.is_container_running():
+                logger.info("ML API container already running")
+                state.update(ml_container_running=True)
+                return True
+
             logger.info(f"Starting ML API container: {Config.ML_API_CONTAINER_NAME}")
             self.container.start()
 
-            # Wait for container to be running
-            for i in range(30):  # Wait up to 30 seconds
+            # Wait up to 30 seconds for the events stream to report the container
+            # running, checking for shutdown between one second slices
+            deadline = time.monotonic() + 30
+            while not self.running_event.wait(timeout=1):
+                if shutdown_event.is_set():
+                    logger.info("Shutdown requested while waiting for ML API container")
+                    return False
+                if time.monotonic() >= deadline:
+                    break
+            if not self.running_event.is_set():
+                # Confirm directly in case the events stream is down
                 self.container.reload()
-                if self.container.status == 'running':
-                    state.update(ml_container_running=True)
-                    logger.info("✓ ML API container started - warming up...")
-                    # Give it a few more seconds to fully initialize
-                    time.sleep(5)
-                    return True
-                time.sleep(1)
-
-            logger.error("ML API container did not start in time")
-            return False
+                if self.container.status != 'running':
+                    logger.error("ML API container did not start in time")
+                    return False
+
+            state.update(ml_container_running=True)
+            logger.info("✓ ML API container started - warming up...")
+            # Give it a few more seconds to fully initialize (cut short on shutdown)
+            shutdown_event.wait(5)
+            return True
         except Exception as e:
             logger.error(f"✗ Failed to start ML API container: {e}")
             return False
@@ -240,7 +354,7 @@ class DockerHandler:
             state.update(
                 standby_mode=False,
                 current_status='monitoring',
-                last_activity_time=datetime.now()
+                last_activity_monotonic=time.monotonic()
             )
             logger.info("✓ Exited standby mode - ML API ready")
             return True
@@ -256,7 +370,14 @@ class MQTTHandler:
         self.client = mqtt.Client(client_id=Config.MQTT_CLIENT_ID, protocol=mqtt.MQTTv5)
         self.client.on_connect = self._on_connect
         self.client.on_disconnect = self._on_disconnect
+        self.client.on_connect_fail = self._on_connect_fail
         self.client.on_message = self._on_message
+        self.client.on_publish = self._on_publish
+        # Raise the in-flight window (default 20) so bursts don't wait on acks
+        self.client.max_inflight_messages_set(100)
+        # Bound the otherwise unlimited outgoing queue so a long broker outage can't
+        # grow memory without limit; publish() fails with MQTT_ERR_QUEUE_SIZE past it
+        self.client.max_queued_messages_set(1000)
         self.connected = False
         self.logged_error = False  # Track if we've already logged connection errors
 
@@ -288,10 +409,19 @@ class MQTTHandler:
         self.connected = False
         state.update(mqtt_connected=False)
 
+    def _on_connect_fail(self, client, userdata):
+        """Broker unreachable - paho keeps retrying in the background"""
+        if not self.logged_error:
+            logger.error(f"✗ MQTT CONNECTION ERROR: Cannot reach broker {Config.MQTT_BROKER_HOST}:{Config.MQTT_BROKER_PORT}")
+            logger.error(f"  → Check MQTT_BROKER_HOST and MQTT_BROKER_PORT in .env file")
+            logger.error(f"  → Ensure MQTT broker is running and accessible - will keep retrying")
+            self.logged_error = True
+        state.update(mqtt_connected=False)
+
     def _on_message(self, client, userdata, msg):
         """Handle incoming MQTT messages (control commands)"""
         try:
-            payload = json.loads(msg.payload.decode())
+            payload = orjson.loads(msg.payload)
             command = payload.get('command', '').lower()
 
             logger.info(f"Received control command: {command}")
@@ -303,14 +433,20 @@ class MQTTHandler:
             else:
                 logger.warning(f"Unknown command received: {command}")
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.error(f"Invalid JSON in control message: {msg.payload}")
         except Exception as e:
             logger.error(f"Error processing control message: {e}")
 
+    def _on_publish(self, client, userdata, mid, *args):
+        """Handle broker acknowledgements for QoS > 0 publishes (runs on paho's network thread)"""
+        logger.debug("Broker acknowledged message %s", mid)
+
     def connect(self):
+        """Start connecting in the background; paho's network thread retries with backoff"""
         try:
-            self.client.connect(Config.MQTT_BROKER_HOST, Config.MQTT_BROKER_PORT, 60)
+            self.client.reconnect_delay_set(min_delay=1, max_delay=60)
+            self.client.connect_async(Config.MQTT_BROKER_HOST, Config.MQTT_BROKER_PORT, 60)
             self.client.loop_start()
         except Exception as e:
             if not self.logged_error:
@@ -322,15 +458,20 @@ class MQTTHandler:
             state.update(mqtt_connected=False)
 
     def publish(self, topic: str, message: Dict[str, Any], qos: int = 1):
+        """Queue a message for publishing without waiting for broker acknowledgement.
+
+        paho's network thread delivers the message and handles PUBACK/PUBCOMP
+        asynchronously; confirmations arrive via _on_publish.
+        """
         if not self.connected:
             logger.debug("Cannot publish: MQTT not connected")
             return False
 
         try:
-            payload = json.dumps(message)
+            payload = orjson.dumps(message)
             result = self.client.publish(topic, payload, qos=qos)
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
-                logger.debug(f"Published to {topic}: {payload}")
+                logger.debug("Queued message %s for %s: %s", result.mid, topic, message)
                 return True
             else:
                 logger.error(f"Failed to publish to {topic}: {result.rc}")
@@ -340,17 +481,31 @@ class MQTTHandler:
             return False
 
     def disconnect(self):
-        self.client.loop_stop()
+        # Refuse new publishes, queue DISCONNECT behind any pending ones, then
+        # let the network thread flush them and exit before joining it
+        self.connected = False
         self.client.disconnect()
+        self.client.loop_stop()
 
 mqtt_handler = MQTTHandler()
 
+# Low-latency FFmpeg demuxer options for the RTSP capture: TCP transport, no
+# input buffering. Read by OpenCV when the capture is opened; an
+# OPENCV_FFMPEG_CAPTURE_OPTIONS set in the environment takes precedence
+os.environ.setdefault('OPENCV_FFMPEG_CAPTURE_OPTIONS', 'rtsp_transport;tcp|fflags;nobuffer|flags;low_delay')
+
 # RTSP Stream Handler with background reader to avoid buffered/stale frames
 class RTSPStreamHandler:
     def __init__(self):
         self.cap: Optional[cv2.VideoCapture] = None
         self.latest_frame: Optional[np.ndarray] = None
         self.frame_lock = threading.Lock()
+        self.frame_request = threading.Event()
+        self.frame_ready = threading.Event()
+        # Double buffer reused by retrieve() so the BGR conversion doesn't allocate a new
+        # frame each time; the consumer keeps the other one until the next swap
+        self.frame_buffers: List[Optional[np.ndarray]] = [None, None]
+        self.next_buffer = 0
         self.reader_thread: Optional[threading.Thread] = None
         self.running = False
         self.last_connection_attempt = 0
@@ -368,11 +523,24 @@ class RTSPStreamHandler:
         try:
             if not self.logged_error:
                 logger.info(f"Attempting to connect to RTSP stream: {Config.RTSP_STREAM_URL}")
-            self.cap = cv2.VideoCapture(Config.RTSP_STREAM_URL, cv2.CAP_FFMPEG)
+            # Hardware acceleration must be requested at open time; ANY falls
+            # back to software decode when no VAAPI/NVDEC/etc. device is available
+            hw_accel = cv2.VIDEO_ACCELERATION_ANY if Config.RTSP_HW_DECODE else cv2.VIDEO_ACCELERATION_NONE
+            # FFmpeg spawns its decoder threads while the capture is opened and they
+            # inherit this thread's affinity, so pin for the duration of the open
+            previous_cpus = self._pin_to_reader_cpus()
+            try:
+                self.cap = cv2.VideoCapture(Config.RTSP_STREAM_URL, cv2.CAP_FFMPEG,
+                                            [cv2.CAP_PROP_HW_ACCELERATION, hw_accel])
+            finally:
+                if previous_cpus is not None:
+                    os.sched_setaffinity(0, previous_cpus)
             self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
             if self.cap.isOpened():
                 logger.info("✓ Successfully connected to RTSP stream")
+                active_accel = int(self.cap.get(cv2.CAP_PROP_HW_ACCELERATION))
+                logger.info(f"  → Hardware decode: {'active' if active_accel != cv2.VIDEO_ACCELERATION_NONE else 'not available, using software'}")
                 state.update(stream_connected=True, error_message=None)
                 self.logged_error = False
                 # Start background reader thread
@@ -397,18 +565,48 @@ class RTSPStreamHandler:
             state.update(stream_connected=False, error_message=str(e))
             return False
 
+    def _pin_to_reader_cpus(self) -> Optional[Set[int]]:
+        """Pin the calling thread to RTSP_READER_CPUS, returning its previous CPU set
+        (None if pinning is not configured or not supported)"""
+        if not Config.RTSP_READER_CPUS:
+            return None
+        try:
+            # pid 0 applies to the calling thread only
+            previous_cpus = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, Config.RTSP_READER_CPUS)
+            return previous_cpus
+        except (AttributeError, OSError) as e:
+            logger.warning(f"Could not pin RTSP reader to CPUs {sorted(Config.RTSP_READER_CPUS)}: {e}")
+            return None
+
     def _reader_loop(self):
-        """Continuously reads frames, keeping only the latest one"""
+        """Continuously grabs frames, converting only the one requested by get_frame() to BGR"""
+        if self._pin_to_reader_cpus() is not None:
+            logger.info(f"RTSP reader and decoder threads pinned to CPUs {sorted(Config.RTSP_READER_CPUS)}")
+
         while self.running and self.cap and self.cap.isOpened():
             try:
-                ret, frame = self.cap.read()
-                if ret and frame is not None and frame.size > 0:
-                    with self.frame_lock:
-                        self.latest_frame = frame
-                else:
-                    logger.warning("Background reader: failed to read frame")
+                # grab() still demuxes and decodes every packet (H.264 inter frames
+                # can't be skipped); it only skips the BGR conversion/copy of retrieve()
+                if not self.cap.grab():
+                    logger.warning("Background reader: failed to grab frame")
                     state.update(stream_connected=False)
                     break
+
+                if self.frame_request.is_set():
+                    buffer = self.frame_buffers[self.next_buffer]
+                    ret, frame = self.cap.retrieve(buffer) if buffer is not None else self.cap.retrieve()
+                    if ret and frame is not None and frame.size > 0:
+                        self.frame_buffers[self.next_buffer] = frame
+                        self.next_buffer ^= 1
+                        with self.frame_lock:
+                            self.latest_frame = frame
+                        self.frame_request.clear()
+                        self.frame_ready.set()
+                    else:
+                        logger.warning("Background reader: failed to retrieve frame")
+                        state.update(stream_connected=False)
+                        break
             except Exception as e:
                 logger.error(f"Background reader error: {e}")
                 state.update(stream_connected=False)
@@ -416,11 +614,24 @@ class RTSPStreamHandler:
         logger.info("RTSP reader thread stopped")
 
     def get_frame(self) -> Optional[np.ndarray]:
-        """Get the latest frame captured by the background reader"""
+        """Request and return the most recently grabbed frame from the background reader"""
         if not self.running or not self.reader_thread or not self.reader_thread.is_alive():
-            if not self.connect():
+            # Don't reopen a stream that disconnect() is closing
+            if shutdown_event.is_set() or not self.connect():
                 return None
 
+        self.frame_ready.clear()
+        # Checked after the clear: shutdown_event is set before disconnect()
+        # sets frame_ready, so a wake-up can't be lost in between
+        if shutdown_event.is_set():
+            return None
+        self.frame_request.set()
+        if not self.frame_ready.wait(timeout=Config.RTSP_TIMEOUT):
+            logger.warning(f"No frame retrieved within {Config.RTSP_TIMEOUT}s")
+            return None
+        if not self.running:
+            return None  # woken by disconnect()
+
         with self.frame_lock:
             frame = self.latest_frame
             self.latest_frame = None  # consume it so next call waits for a new one
@@ -429,6 +640,8 @@ class RTSPStreamHandler:
     def disconnect(self):
         """Stop reader and disconnect from RTSP stream"""
         self.running = False
+        # Wake a get_frame() caller still waiting on the reader
+        self.frame_ready.set()
         if self.reader_thread:
             self.reader_thread.join(timeout=3)
             self.reader_thread = None
@@ -436,6 +649,8 @@ class RTSPStreamHandler:
             self.cap.release()
             self.cap = None
         self.latest_frame = None
+        self.frame_buffers = [None, None]
+        self.frame_request.clear()
         state.update(stream_connected=False)
 
 stream_handler = RTSPStreamHandler()
@@ -444,18 +659,24 @@ stream_handler = RTSPStreamHandler()
 class MotionDetector:
     def __init__(self):
         self.prev_frame_gray: Optional[np.ndarray] = None
+        # Make sure OpenCV dispatches to its SIMD (SSE/AVX/NEON) kernels
+        cv2.setUseOptimized(True)
+
+    def detect(self, gray: np.ndarray, pixel_scale: float = 1.0) -> bool:
+        """Compare grayscale frame to previous, return True if motion detected.
 
-    def detect(self, frame: np.ndarray) -> bool:
-        """Compare current frame to previous, return True if motion detected"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        pixel_scale is the number of full-resolution pixels each pixel of gray
+        covers, so MOTION_PIXEL_THRESHOLD keeps meaning full-resolution pixels.
+        """
         gray = cv2.GaussianBlur(gray, (5, 5), 0)
 
         motion = False
-        if self.prev_frame_gray is not None:
+        if self.prev_frame_gray is not None and self.prev_frame_gray.shape == gray.shape:
             diff = cv2.absdiff(self.prev_frame_gray, gray)
-            changed_pixels = np.count_nonzero(diff > Config.MOTION_INTENSITY_THRESHOLD)
+            _, mask = cv2.threshold(diff, Config.MOTION_INTENSITY_THRESHOLD, 255, cv2.THRESH_BINARY)
+            changed_pixels = int(cv2.countNonZero(mask) * pixel_scale)
             motion = changed_pixels > Config.MOTION_PIXEL_THRESHOLD
-            logger.debug(f"Motion check: {changed_pixels} changed pixels (threshold: {Config.MOTION_PIXEL_THRESHOLD})")
+            logger.debug("Motion check: %d changed pixels (threshold: %d)", changed_pixels, Config.MOTION_PIXEL_THRESHOLD)
 
         self.prev_frame_gray = gray
         return motion
@@ -466,21 +687,30 @@ motion_detector = MotionDetector()
 class MLAPIHandler:
     def __init__(self):
         self.session = requests.Session()
-        self.last_health_check = 0
+        # Single upstream host - keep a small pool of keep-alive connections to it
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
+        # Responses are tiny and travel over the compose network - skip gzip
+        self.session.headers['Accept-Encoding'] = 'identity'
         self.health_check_interval = 30  # seconds
 
-    def check_health(self) -> bool:
-        """Check if ML API is healthy"""
-        current_time = time.time()
-        if current_time - self.last_health_check < self.health_check_interval:
-            return state.ml_api_healthy
+    def health_loop(self):
+        """Periodically probe ML API health off the monitor loop's critical path"""
+        logger.info("Starting ML API health probe")
 
-        self.last_health_check = current_time
+        while not shutdown_event.is_set():
+            # The container is deliberately stopped in standby
+            if not state.standby_mode:
+                self.check_health()
+            shutdown_event.wait(self.health_check_interval)
+
+        logger.info("ML API health probe stopped")
 
+    def check_health(self) -> bool:
+        """Check if ML API is healthy"""
         try:
             response = self.session.get(
                 f"{Config.ML_API_URL}/hc/",
-                timeout=5
+                timeout=(1, 2)  # (connect, read) - a hung ML API fails fast
             )
             healthy = response.status_code == 200 and response.text == 'ok'
             state.update(ml_api_healthy=healthy)
@@ -496,12 +726,9 @@ class MLAPIHandler:
 
     def analyze_frame(self, frame: np.ndarray) -> Optional[Dict[str, Any]]:
         """Send frame to ML API for analysis"""
-        # Check health for monitoring purposes
-        self.check_health()
-
         try:
-            # The ML API expects a GET request with an img URL parameter
-            # We serve the frame from our own Flask server at /latest_frame.jpg
+            # The ML API expects a GET request with an img URL parameter (it has no
+            # upload endpoint), so it fetches the cached JPEG from /latest_frame.jpg
             frame_url = f"http://print-monitor:8080/latest_frame.jpg"
 
             # Send to ML API
@@ -513,8 +740,8 @@ class MLAPIHandler:
             )
 
             if response.status_code == 200:
-                result = response.json()
-                logger.debug(f"ML API response: {result}")
+                result = orjson.loads(response.content)
+                logger.debug("ML API response: %s", result)
                 return result
             else:
                 logger.error(f"ML API returned error: {response.status_code} - {response.text}")
@@ -529,21 +756,48 @@ class MLAPIHandler:
 
 ml_api_handler = MLAPIHandler()
 
-# Frame to base64 for web display
-def frame_to_base64(frame: np.ndarray) -> str:
-    """Convert OpenCV frame to base64 encoded JPEG"""
+# Frame encoding - a clean JPEG for the ML API, a timestamped preview for the web UI
+JPEG_QUALITY = 85
+PREVIEW_JPEG_QUALITY = 70
+
+def resize_long_edge(frame: np.ndarray, long_edge: int) -> np.ndarray:
+    """Downscale frame so its longest side is at most long_edge pixels"""
+    scale = long_edge / max(frame.shape[:2])
+    if scale >= 1:
+        return frame.copy()
+    return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+def scale_detection_boxes(detections: List[list], scale_x: float, scale_y: float) -> List[list]:
+    """Map [name, confidence, [x, y, w, h]] boxes from the downscaled ML input
+    back to camera resolution"""
+    if scale_x == 1 and scale_y == 1:
+        return detections
+    scaled = []
+    for name, confidence, box, *rest in detections:
+        if isinstance(box, list) and len(box) == 4:
+            box = [box[0] * scale_x, box[1] * scale_y, box[2] * scale_x, box[3] * scale_y]
+        scaled.append([name, confidence, box, *rest])
+    return scaled
+
+def encode_jpeg(frame: np.ndarray, quality: int = JPEG_QUALITY) -> Optional[bytes]:
+    """Encode OpenCV frame as JPEG bytes"""
     try:
-        success, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        success, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
         if success:
-            return base64.b64encode(buffer).decode('utf-8')
+            return buffer.tobytes()
     except Exception as e:
-        logger.error(f"Error converting frame to base64: {e}")
-    return ""
+        logger.error(f"Error encoding frame as JPEG: {e}")
+    return None
+
+# Failure alerts carry at most this many detections, highest confidence first
+FAILURE_ALERT_MAX_DETECTIONS = 10
 
 # Main monitoring loop
 def monitor_loop():
     """Main monitoring loop that checks frames periodically"""
     logger.info("Starting monitor loop")
+    last_failure_detections: Optional[bytes] = None  # serialized detections of the last published alert
+    skipped_checks = 0  # consecutive ML checks skipped because the frame did not change
 
     while not shutdown_event.is_set():
         try:
@@ -556,128 +810,174 @@ def monitor_loop():
                     current_status='error',
                     error_message='Cannot capture frame from stream'
                 )
-                time.sleep(Config.CHECK_INTERVAL_SECONDS)
+                shutdown_event.wait(Config.CHECK_INTERVAL_SECONDS)
                 continue
 
-            # Draw timestamp overlay on frame
+            # The ML frame and web preview share one ML_INPUT_SIZE copy
+            small = resize_long_edge(frame, Config.ML_INPUT_SIZE)
+
+            # Motion uses a fixed 2x downscale regardless of camera resolution, so the
+            # 5x5 blur and MOTION_INTENSITY_THRESHOLD stay close to full-resolution behaviour
+            half = cv2.resize(frame, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+            gray = cv2.cvtColor(half, cv2.COLOR_BGR2GRAY)
+            pixel_scale = (frame.shape[0] * frame.shape[1]) / (gray.shape[0] * gray.shape[1])
+
+            # The ML API gets the frame without the overlay (served from /latest_frame.jpg)
+            frame_jpeg = encode_jpeg(small)
+
+            # Draw timestamp overlay on the web preview only; small is not used for
+            # anything else after this, so it is drawn on in place
             now = datetime.now()
+            now_monotonic = time.monotonic()
             timestamp_text = now.strftime('%Y-%m-%d %H:%M:%S')
-            cv2.putText(frame, timestamp_text, (10, 30),
+            cv2.putText(small, timestamp_text, (10, 30),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 3, cv2.LINE_AA)
-            cv2.putText(frame, timestamp_text, (10, 30),
+            cv2.putText(small, timestamp_text, (10, 30),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 1, cv2.LINE_AA)
+            preview_jpeg = encode_jpeg(small, PREVIEW_JPEG_QUALITY)
 
-            # Update state with frame
-            frame_b64 = frame_to_base64(frame)
-            state.update(
-                last_frame=frame,
-                last_frame_base64=frame_b64,
-                last_check_time=now
-            )
+            # State changes for this tick are collected and applied in one update
+            updates: Dict[str, Any] = {
+                'last_frame_jpeg': frame_jpeg,
+                'last_preview_jpeg': preview_jpeg,
+                'last_check_time': now
+            }
 
             # Motion detection
-            motion = motion_detector.detect(frame)
+            motion = motion_detector.detect(gray, pixel_scale)
             if motion:
-                state.update(last_motion_time=datetime.now())
-                # Exit standby if motion detected while in standby
-                if state.standby_mode:
-                    logger.info("Motion detected while in standby - exiting standby")
-                    docker_handler.exit_standby()
+                updates['last_motion_time'] = now
+                updates['last_motion_monotonic'] = now_monotonic
+            last_motion_monotonic = updates.get('last_motion_monotonic', state.last_motion_monotonic)
 
             # Determine if printer is active based on recent motion
-            is_active = (state.last_motion_time is not None and
-                         (datetime.now() - state.last_motion_time).total_seconds() < Config.IDLE_TIMEOUT)
+            is_active = (last_motion_monotonic is not None and
+                         now_monotonic - last_motion_monotonic < Config.IDLE_TIMEOUT)
 
             if not is_active:
                 logger.debug("Idle - no motion detected")
-                state.update(current_status='idle', error_message=None)
+                updates.update(current_status='idle', error_message=None)
+                state.update(**updates)
 
                 # Check for auto-standby
                 if Config.STANDBY_MODE_ENABLED and Config.STANDBY_AUTO_TIMEOUT > 0 and not state.standby_mode:
-                    if state.last_activity_time:
-                        time_since_activity = (datetime.now() - state.last_activity_time).total_seconds()
-                        if time_since_activity > Config.STANDBY_AUTO_TIMEOUT:
-                            logger.info(f"Auto-standby: {int(time_since_activity)}s since last activity (threshold: {Config.STANDBY_AUTO_TIMEOUT}s)")
-                            docker_handler.enter_standby()
+                    time_since_activity = time.monotonic() - state.last_activity_monotonic
+                    if time_since_activity > Config.STANDBY_AUTO_TIMEOUT:
+                        logger.info(f"Auto-standby: {int(time_since_activity)}s since last activity (threshold: {Config.STANDBY_AUTO_TIMEOUT}s)")
+                        docker_handler.enter_standby()
 
-                time.sleep(Config.CHECK_INTERVAL_SECONDS)
+                shutdown_event.wait(Config.CHECK_INTERVAL_SECONDS)
                 continue
 
+            # Publish the new frame before the ML API fetches it
+            state.update(**updates)
+
+            # Exit standby if motion detected while in standby
+            if motion and state.standby_mode:
+                logger.info("Motion detected while in standby - exiting standby")
+                docker_handler.exit_standby()
+
             # Active but ML container not ready yet (warming up after standby exit)
             if state.standby_mode:
                 logger.debug("Waiting for ML container after standby exit")
-                time.sleep(Config.CHECK_INTERVAL_SECONDS)
+                shutdown_event.wait(Config.CHECK_INTERVAL_SECONDS)
+                continue
+
+            # Frame unchanged since the last check - keep the previous ML result,
+            # but still run a full check every ML_MAX_SKIPPED_CHECKS + 1 ticks
+            if (not motion and skipped_checks < Config.ML_MAX_SKIPPED_CHECKS
+                    and state.current_status in ('ok', 'failure')):
+                skipped_checks += 1
+                logger.debug("No motion since last check - reusing previous ML result (%d/%d)",
+                             skipped_checks, Config.ML_MAX_SKIPPED_CHECKS)
+                shutdown_event.wait(Config.CHECK_INTERVAL_SECONDS)
                 continue
+            skipped_checks = 0
 
             # Active - analyze frame with ML API
             result = ml_api_handler.analyze_frame(frame)
 
             if result is None:
                 logger.warning("ML API analysis failed")
-                state.update(
-                    current_status='error',
-                    error_message='ML API analysis failed',
-                    failed_checks=state.failed_checks + 1
-                )
+                state.increment('failed_checks')
+                updates = {
+                    'current_status': 'error',
+                    'error_message': 'ML API analysis failed'
+                }
             else:
                 # Parse ML API response
                 # Obico ML API returns: {"detections": [[name, confidence, [x, y, w, h]], ...]}
                 detections = result.get('detections', [])
-                logger.info(f"ML API raw response: {result}")
+                logger.info("ML API raw response: %s", result)
 
                 max_confidence = 0.0
                 failure_detected = False
 
                 if detections:
                     # Each detection is [name, confidence, [x, y, w, h]]
-                    for detection in detections:
-                        if isinstance(detection, list) and len(detection) >= 3:
-                            confidence = detection[1]
-                            max_confidence = max(max_confidence, confidence)
-                            if confidence >= Config.DETECTION_THRESHOLD:
-                                failure_detected = True
-
-                state.update(
-                    total_checks=state.total_checks + 1,
-                    detection_confidence=max_confidence,
-                    failure_detected=failure_detected
-                )
+                    valid_detections = [d for d in detections if isinstance(d, list) and len(d) >= 3]
+                    confidences = np.fromiter(
+                        (d[1] for d in valid_detections),
+                        dtype=np.float64, count=len(valid_detections)
+                    )
+                    if confidences.size:
+                        max_confidence = float(confidences.max())
+                        failure_detected = max_confidence >= Config.DETECTION_THRESHOLD
+
+                state.increment('total_checks')
+                updates = {
+                    'detection_confidence': max_confidence,
+                    'failure_detected': failure_detected,
+                    'current_status': 'failure' if failure_detected else 'ok',
+                    'error_message': None,
+                    'last_activity_monotonic': time.monotonic()
+                }
 
                 if failure_detected:
                     logger.warning(f"FAILURE DETECTED! Confidence: {max_confidence:.2%}")
-                    state.update(
-                        current_status='failure',
-                        error_message=None,
-                        last_activity_time=datetime.now()
-                    )
 
-                    # Publish failure to MQTT
-                    failure_message = {
-                        'status': 'failure',
-                        'confidence': max_confidence,
-                        'timestamp': datetime.now().isoformat(),
-                        'detections': detections
-                    }
-                    mqtt_handler.publish(Config.MQTT_TOPIC_FAILURE, failure_message, qos=2)
+                    # Publish failure to MQTT, unless it repeats the last alert exactly
+                    detections_key = orjson.dumps(detections)
+                    if detections_key != last_failure_detections:
+                        # Keep the alert payload bounded - only the most confident detections
+                        alert_detections = valid_detections
+                        if confidences.size > FAILURE_ALERT_MAX_DETECTIONS:
+                            top = np.argpartition(-confidences, FAILURE_ALERT_MAX_DETECTIONS)[:FAILURE_ALERT_MAX_DETECTIONS]
+                            top = top[np.argsort(-confidences[top])]
+                            alert_detections = [valid_detections[i] for i in top]
+                        # The ML API saw the ML_INPUT_SIZE frame; report boxes in camera pixels
+                        alert_detections = scale_detection_boxes(
+                            alert_detections,
+                            frame.shape[1] / small.shape[1],
+                            frame.shape[0] / small.shape[0]
+                        )
+                        failure_message = {
+                            'status': 'failure',
+                            'confidence': max_confidence,
+                            'timestamp': datetime.now().isoformat(),
+                            'detections': alert_detections
+                        }
+                        if mqtt_handler.publish(Config.MQTT_TOPIC_FAILURE, failure_message, qos=1):
+                            last_failure_detections = detections_key
+                    else:
+                        logger.debug("Detections unchanged since last failure alert - not republishing")
                 else:
+                    last_failure_detections = None
                     logger.info("Print OK - No failure detected")
-                    state.update(
-                        current_status='ok',
-                        error_message=None,
-                        last_activity_time=datetime.now()
-                    )
+
+            state.update(**updates)
 
             # Wait for next check
-            time.sleep(Config.CHECK_INTERVAL_SECONDS)
+            shutdown_event.wait(Config.CHECK_INTERVAL_SECONDS)
 
         except Exception as e:
             logger.error(f"Error in monitor loop: {e}", exc_info=True)
+            state.increment('failed_checks')
             state.update(
                 current_status='error',
-                error_message=str(e),
-                failed_checks=state.failed_checks + 1
+                error_message=str(e)
             )
-            time.sleep(Config.CHECK_INTERVAL_SECONDS)
+            shutdown_event.wait(Config.CHECK_INTERVAL_SECONDS)
 
     logger.info("Monitor loop stopped")
 
@@ -703,7 +1003,7 @@ def heartbeat_loop():
             }
 
             mqtt_handler.publish(Config.MQTT_TOPIC_HEARTBEAT, heartbeat_message, qos=0)
-            logger.debug(f"Heartbeat sent: {state.current_status} (standby: {state.standby_mode})")
+            logger.debug("Heartbeat sent: %s (standby: %s)", state.current_status, state.standby_mode)
 
         except Exception as e:
             logger.error(f"Error in heartbeat loop: {e}")
@@ -716,83 +1016,139 @@ def heartbeat_loop():
 # Flask Web UI
 app = Flask(__name__)
 
+def json_response(payload: Dict[str, Any], status: int = 200) -> Response:
+    """Serialize payload with orjson - stands in for flask.jsonify"""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
 @app.route('/')
 def index():
     """Serve the main web UI"""
     return render_template('index.html')
 
+# Prefixed to status ETags so a cached version from before a restart never matches
+STATUS_ETAG_PREFIX = format(int(time.time()), 'x')
+
 @app.route('/api/status')
 def api_status():
     """API endpoint for current status"""
-    return jsonify(state.get_state_dict())
+    body, version = state.get_status_json()
+    etag = f'"{STATUS_ETAG_PREFIX}-{version}"'
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag in request.headers.get('If-None-Match', ''):
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype='application/json', headers=headers)
 
 @app.route('/latest_frame.jpg')
 def latest_frame():
     """Serve the latest frame as JPEG"""
-    if state.last_frame is not None:
-        success, buffer = cv2.imencode('.jpg', state.last_frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
-        if success:
-            from flask import send_file
-            from io import BytesIO
-            return send_file(BytesIO(buffer), mimetype='image/jpeg')
-    return jsonify({'error': 'No frame available'}), 404
+    frame_jpeg = state.last_frame_jpeg
+    if frame_jpeg:
+        return Response(frame_jpeg, mimetype='image/jpeg', headers={'Cache-Control': 'public, max-age=1'})
+    return json_response({'error': 'No frame available'}, 404)
+
+HEALTHY_STATUSES = frozenset(('ok', 'failure', 'starting', 'idle', 'standby'))
+HEALTHY_RESPONSE_BODY = orjson.dumps({'status': 'healthy'})
 
 @app.route('/health')
 def health():
     """Health check endpoint for Docker"""
-    if state.current_status in ['ok', 'failure', 'starting', 'idle', 'standby']:
-        return jsonify({'status': 'healthy'}), 200
-    else:
-        return jsonify({'status': 'unhealthy', 'error': state.error_message}), 503
-
-@app.route('/api/standby/enable', methods=['POST'])
-def api_standby_enable():
-    """Enable standby mode"""
-    if not Config.STANDBY_MODE_ENABLED:
-        return jsonify({'error': 'Standby mode is disabled in configuration'}), 400
-
-    success = docker_handler.enter_standby()
-    if success:
-        return jsonify({'success': True, 'standby_mode': True})
+    if state.current_status in HEALTHY_STATUSES:
+        return Response(HEALTHY_RESPONSE_BODY, mimetype='application/json')
     else:
-        return jsonify({'error': 'Failed to enter standby mode'}), 500
-
-@app.route('/api/standby/disable', methods=['POST'])
-def api_standby_disable():
-    """Disable standby mode"""
-    if not Config.STANDBY_MODE_ENABLED:
-        return jsonify({'error': 'Standby mode is disabled in configuration'}), 400
+        return json_response({'status': 'unhealthy', 'error': state.error_message}, 503)
+
+# Standby control routes - registered according to configuration, which is
+# fixed at startup, so handlers don't re-check it on every request
+if Config.STANDBY_MODE_ENABLED:
+    @app.route('/api/standby/enable', methods=['POST'])
+    def api_standby_enable():
+        """Enable standby mode"""
+        success = docker_handler.enter_standby()
+        if success:
+            return json_response({'success': True, 'standby_mode': True})
+        else:
+            return json_response({'error': 'Failed to enter standby mode'}, 500)
 
-    success = docker_handler.exit_standby()
-    if success:
-        return jsonify({'success': True, 'standby_mode': False})
-    else:
-        return jsonify({'error': 'Failed to exit standby mode'}), 500
+    @app.route('/api/standby/disable', methods=['POST'])
+    def api_standby_disable():
+        """Disable standby mode"""
+        success = docker_handler.exit_standby()
+        if success:
+            return json_response({'success': True, 'standby_mode': False})
+        else:
+            return json_response({'error': 'Failed to exit standby mode'}, 500)
+else:
+    @app.route('/api/standby/enable', methods=['POST'])
+    @app.route('/api/standby/disable', methods=['POST'])
+    def api_standby_unavailable():
+        """Reject standby control when standby mode is disabled"""
+        return json_response({'error': 'Standby mode is disabled in configuration'}, 400)
+
+# Configuration part of the standby status response - fixed for the process lifetime
+STANDBY_STATUS_STATIC = {
+    'standby_enabled': Config.STANDBY_MODE_ENABLED,
+    'auto_timeout': Config.STANDBY_AUTO_TIMEOUT
+}
 
 @app.route('/api/standby/status')
 def api_standby_status():
     """Get standby mode status"""
-    return jsonify({
-        'standby_mode': state.standby_mode,
-        'standby_enabled': Config.STANDBY_MODE_ENABLED,
-        'auto_timeout': Config.STANDBY_AUTO_TIMEOUT,
-        'ml_container_running': state.ml_container_running
-    })
+    payload = STANDBY_STATUS_STATIC.copy()
+    # Read the runtime fields once, under a single lock acquisition
+    with state.lock:
+        payload['standby_mode'] = state.standby_mode
+        payload['ml_container_running'] = state.ml_container_running
+    return json_response(payload)
 
 def run_flask():
     """Run Flask server"""
-    logger.info(f"Starting web server on internal port {Config.INTERNAL_PORT} (external: {Config.WEB_PORT})")
-    app.run(host='0.0.0.0', port=Config.INTERNAL_PORT, debug=False, threaded=True)
+    logger.info("Starting web server on internal port %s (external: %s)", Config.INTERNAL_PORT, Config.WEB_PORT)
+    # Fixed worker pool fed by a single accept loop; bound open connections and
+    # drop idle ones so stale dashboard tabs can't pile up
+    serve(app, host='0.0.0.0', port=Config.INTERNAL_PORT, threads=4,
+          connection_limit=200, channel_timeout=30)
 
 # Signal handlers
+received_signal: Optional[int] = None
+
 def signal_handler(signum, frame):
-    """Handle shutdown signals gracefully"""
-    logger.info(f"Received signal {signum}, shutting down...")
+    """Handle shutdown signals gracefully.
+
+    Avoids the logging module (and its locks) - main() logs the signal once
+    shutdown_event.wait() returns.
+    """
+    global received_signal
+    received_signal = signum
+    os.write(2, b"Shutdown signal received\n")
     shutdown_event.set()
 
+# Startup configuration summary, logged as a single record by main()
+STARTUP_BANNER = (
+    "RTSP Stream: %s\n"
+    "ML API: %s\n"
+    "MQTT Broker: %s:%d\n"
+    "Check Interval: %ds\n"
+    "Heartbeat Interval: %ds\n"
+    "Detection Threshold: %s\n"
+    "ML Input Size: %dpx (long edge)\n"
+    "Web UI Port: %d\n"
+    "Motion Detection: intensity>%d, pixels>%d, idle_timeout=%ds\n"
+    "OpenCV: %s (optimized code: %s, threads: %d)\n"
+    "Standby Mode: %s%s\n"
+    "%s"
+)
+
 # Main entry point
 def main():
     """Main entry point for the application"""
+    standby_on = Config.STANDBY_MODE_ENABLED
+    standby_timeout = Config.STANDBY_AUTO_TIMEOUT
+    ml_name = Config.ML_API_CONTAINER_NAME
+
+    # Setup signal handlers first so startup can be interrupted cleanly
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
     logger.info("=" * 80)
     logger.info("Print Monitor Service Starting")
     logger.info("=" * 80)
@@ -811,55 +1167,78 @@ def main():
         logger.warning("  → Edit .env file and restart the service to update configuration")
         logger.warning("=" * 80)
 
-    logger.info(f"RTSP Stream: {Config.RTSP_STREAM_URL}")
-    logger.info(f"ML API: {Config.ML_API_URL}")
-    logger.info(f"MQTT Broker: {Config.MQTT_BROKER_HOST}:{Config.MQTT_BROKER_PORT}")
-    logger.info(f"Check Interval: {Config.CHECK_INTERVAL_SECONDS}s")
-    logger.info(f"Heartbeat Interval: {Config.MQTT_HEARTBEAT_INTERVAL}s")
-    logger.info(f"Detection Threshold: {Config.DETECTION_THRESHOLD}")
-    logger.info(f"Web UI Port: {Config.WEB_PORT}")
-    logger.info(f"Motion Detection: intensity>{Config.MOTION_INTENSITY_THRESHOLD}, pixels>{Config.MOTION_PIXEL_THRESHOLD}, idle_timeout={Config.IDLE_TIMEOUT}s")
-    logger.info(f"Standby Mode: {'ENABLED' if Config.STANDBY_MODE_ENABLED else 'DISABLED'}")
-    if Config.STANDBY_MODE_ENABLED:
-        logger.info(f"  → Auto-Standby Timeout: {Config.STANDBY_AUTO_TIMEOUT}s ({Config.STANDBY_AUTO_TIMEOUT/60:.1f} min)")
-        logger.info(f"  → ML Container: {Config.ML_API_CONTAINER_NAME}")
-    logger.info("=" * 80)
-
-    # Setup signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Emit the configuration summary as a single log record, formatted in one pass
+    standby_details = ""
+    if standby_on:
+        standby_details = "\n  → Auto-Standby Timeout: %ds (%.1f min)\n  → ML Container: %s" % (
+            standby_timeout, standby_timeout / 60, ml_name)
+    logger.info(
+        STARTUP_BANNER,
+        Config.RTSP_STREAM_URL,
+        Config.ML_API_URL,
+        Config.MQTT_BROKER_HOST, Config.MQTT_BROKER_PORT,
+        Config.CHECK_INTERVAL_SECONDS,
+        Config.MQTT_HEARTBEAT_INTERVAL,
+        Config.DETECTION_THRESHOLD,
+        Config.ML_INPUT_SIZE,
+        Config.WEB_PORT,
+        Config.MOTION_INTENSITY_THRESHOLD, Config.MOTION_PIXEL_THRESHOLD, Config.IDLE_TIMEOUT,
+        cv2.__version__, 'ON' if cv2.useOptimized() else 'OFF', cv2.getNumThreads(),
+        'ENABLED' if standby_on else 'DISABLED', standby_details,
+        "=" * 80
+    )
+
+    # Start the web server first so /health answers while the broker and
+    # stream are still connecting
+    flask_thread = threading.Thread(target=run_flask, name="FlaskThread", daemon=True)
+    flask_thread.start()
 
-    # Connect to MQTT
+    # Connect to MQTT (non-blocking - connect_async defers the TCP connect,
+    # including DNS, to paho's network thread)
     mqtt_handler.connect()
 
-    # Start threads
-    monitor_thread = threading.Thread(target=monitor_loop, name="MonitorThread", daemon=True)
-    heartbeat_thread = threading.Thread(target=heartbeat_loop, name="HeartbeatThread", daemon=True)
-    flask_thread = threading.Thread(target=run_flask, name="FlaskThread", daemon=True)
+    # Start threads - workers are non-daemon so they finish their current step
+    # on shutdown; they all wake on shutdown_event
+    monitor_thread = threading.Thread(target=monitor_loop, name="MonitorThread")
+    heartbeat_thread = threading.Thread(target=heartbeat_loop, name="HeartbeatThread")
+    health_thread = threading.Thread(target=ml_api_handler.health_loop, name="MLHealthThread")
 
     monitor_thread.start()
     heartbeat_thread.start()
-    flask_thread.start()
+    health_thread.start()
 
-    logger.info("All threads started successfully")
+    logger.info("All threads started successfully (startup took %.2fs)", time.monotonic() - STARTUP_T0)
 
     # Wait for shutdown signal
     try:
-        while not shutdown_event.is_set():
-            time.sleep(1)
+        shutdown_event.wait()
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received")
         shutdown_event.set()
 
-    # Cleanup
+    if received_signal is not None:
+        logger.info("Received signal %s, shutting down...", received_signal)
+
+    # Cleanup - the stream disconnect runs in parallel with the workers winding down
     logger.info("Shutting down...")
-    stream_handler.disconnect()
+    stream_disconnect_thread = threading.Thread(target=stream_handler.disconnect, name="StreamDisconnect")
+    stream_disconnect_thread.start()
+
+    # Wait for everything to finish, sharing a single 5 second budget
+    deadline = time.monotonic() + 5
+    workers = (stream_disconnect_thread, monitor_thread, heartbeat_thread, health_thread)
+    for thread in workers:
+        thread.join(timeout=max(0, deadline - time.monotonic()))
+
+    # Non-daemon threads still keep the process alive until they return (e.g. a
+    # worker in the middle of an ML API request), so make any straggler visible
+    for thread in workers:
+        if thread.is_alive():
+            logger.warning("%s still running after shutdown deadline - waiting for it to finish", thread.name)
+
+    # Workers are done publishing - flush their last messages and close MQTT
     mqtt_handler.disconnect()
 
-    # Wait for threads to finish
-    monitor_thread.join(timeout=5)
-    heartbeat_thread.join(timeout=5)
-
     logger.info("Shutdown complete")
 
 if __name__ == '__main__':